@@ -1,6 +1,7 @@
 
+from collections.abc import Iterable
 from decimal import Decimal
-from math import trunc
+from math import ceil, floor, trunc
 import operator
 import re
 
@@ -11,16 +12,26 @@ import re
 
 class MetaBytes(type):
     def __new__(cls, name, bases, dct):
-        def eq (self, other):
-            return self.BASE == other.BASE and self.UNIT_SYMBOLS == other.UNIT_SYMBOLS
         c = super().__new__(cls, name, bases, dct)
-        c.__eq__ = eq
-        c.__str__ = lambda self: name
         for exp, u in enumerate(c.UNIT_SYMBOLS):
             c.EXP_SYM[u] = c.BASE ** exp
         for u in c.UNIT_SYMBOLS:
             setattr(c, u, u)
+        # one regex for all the suffixes, longest first
+        syms = sorted(c.UNIT_SYMBOLS, key=len, reverse=True)
+        c.SUFFIX_RE = re.compile(r'\A(.+?)({})\Z'.format('|'.join(map(re.escape, syms))))
+        # exponents can be cached by the units, unless the standard says otherwise
+        c.FIXED_EXP = getattr(c, 'FIXED_EXP', True)
         return c
+    def __eq__ (cls, other):
+        if not isinstance(other, MetaBytes):
+            return NotImplemented
+        return cls.BASE == other.BASE and cls.UNIT_SYMBOLS == other.UNIT_SYMBOLS
+    def __hash__ (cls):
+        # NOTE: not using BASE, which VariBaseBytes can change
+        return hash(cls.UNIT_SYMBOLS)
+    def __str__ (cls):
+        return cls.__name__
 
 class SIBytes(metaclass=MetaBytes):
     BASE = 1000
@@ -46,6 +57,10 @@ class VariBaseBytes(MEMBytes):
     Specilized class, only meant to be used for in place base conversions
     (to get the corresponding bytes value).
     """
+    # its own table, convert_base must not change the MEMBytes one
+    EXP_SYM: dict[str,int] = {}
+    # EXP_SYM changes with the base, BytesUnit must not cache its values
+    FIXED_EXP = False
     @classmethod
     def convert_base(c, base: int):
         c.BASE = base
@@ -58,9 +73,7 @@ class VariBaseBytes(MEMBytes):
 
 def format_num (n, decs=2):
     """Get rid of some annoiyng outputs in scientific notation of string.format()"""
-    import math
-    decimal = '0' if trunc(n) == n else str(decs)
-    return '{:.{}f}'.format(n, decimal)
+    return f'{n:.0f}' if trunc(n) == n else f'{n:.{decs}f}'
 
 # unused... keep here anyway :)
 def decimals_threshold (n, precision=4):
@@ -70,6 +83,20 @@ def decimals_threshold (n, precision=4):
     r =  (n - int(n)) * exp
     return True if (n - int(n)) * exp < 1 else False
 
+def _exact_div (n, d):
+    """
+    Returns n / d, as an exact int if *n* is an int multiple of *d*
+    (avoids float rounding for whole amounts of bytes).
+    """
+    if isinstance(n, int):
+        q, r = divmod(n, d)
+        if not r:
+            return q
+    return n / d
+
+def _abs_diff (a, b):
+    return abs(a - b)
+
 def nearest_mapval (value, mapping, cmpfunc=None):
     """
     Finds the *value*'s nearest value inside *mapping*.
@@ -77,16 +104,30 @@ def nearest_mapval (value, mapping, cmpfunc=None):
     distance between the given *value* and the found one.
     *cmpfunc* is the comparison function between *value* and
     the mapping's values as `func(mapping_value, value)` and
-    must returns something that can be sorted(). If None,
+    must returns something that can be compared with min(). If None,
     use a default cmp func which returns abs(mapping_value - value).
     """
-    d = {}
-    if cmpfunc is None:
-        def cmpfunc (a, b):
-            return abs(a - b)
-    for k, v in mapping.items():
-        d[k] = cmpfunc(v, value)
-    return sorted(d.items(),key=lambda p:p[1])[0]
+    cmp = cmpfunc or _abs_diff
+    k, v = min(mapping.items(), key=lambda kv: cmp(kv[1], value))
+    return k, cmp(v, value)
+
+
+def _match_bytes (string: str, match: re.Match, exp_value: int) -> int:
+    """
+    Returns the number of bytes of a *string* matched by a SUFFIX_RE
+    (as *match*), with *exp_value* the exponent of the matched suffix.
+    Raises ValueError for wrong or too big values.
+    """
+    numstr = match.group(1)
+    try:
+        if numstr.isdecimal():
+            # already an exact int, no need for float()
+            return int(numstr) * exp_value
+        return int(float(numstr) * exp_value)
+    except ValueError:
+        raise ValueError(f'string <{string}>: wrong value: <{numstr}>') from None
+    except OverflowError:
+        raise ValueError('<{}> is too big!'.format(numstr)) from None
 
 
 def string_to_bytes (string: str,
@@ -101,33 +142,52 @@ def string_to_bytes (string: str,
     the latter a bool indicating if the input *string* already contains a suffix.
     Raises ValueError if something went wrong.
     """
-    def get_bytes (match, exp_value):
-        numstr, suffix = match.groups()
-        if re.fullmatch('\d+', numstr):
-            conv = int
-        else:
-            conv = float
-        try:
-            return int(conv(numstr) * exp_value)
-        except ValueError:
-            raise ValueError(f'string <{string}>: wrong value: <{numstr}>') from None
-        except OverflowError:
-            raise ValueError('<{}> is too big!'.format(numstr)) from None
     # find the unit
-    for suffix, exp_value in reversed(standard.EXP_SYM.items()):
-        if match := re.fullmatch('(.+?)({})'.format(suffix), string):
-            b = get_bytes(match, exp_value)
-            return (b, suffix, True) if with_suffix else b
+    if match := standard.SUFFIX_RE.match(string):
+        suffix = match.group(2)
+        b = _match_bytes(string, match, standard.EXP_SYM[suffix])
+        return (b, suffix, True) if with_suffix else b
     else:
         # NOTE: bare numbers without suffix
         try:
-            b = int(float(string))
+            b = int(string) if string.isdecimal() else int(float(string))
             return (b, standard.SYMBOL, False) if with_suffix else b
         except ValueError:
             raise ValueError(f'wrong value: <{string}>') from None
     raise ValueError(f'you found a bug!') # should never happens
 
 
+def string_to_bytes_batch (strings: Iterable[str],
+                           standard: MetaBytes = SIBytes) -> list[int]:
+    """
+    Returns a list of the number of bytes represented by each of *strings*,
+    like calling string_to_bytes(string, standard) for each one but faster
+    when parsing many strings. Only bare non-integer numbers are handled
+    by string_to_bytes.
+    Raises ValueError at the first wrong string.
+    """
+    match = standard.SUFFIX_RE.match
+    exp_sym = standard.EXP_SYM
+    out = []
+    append = out.append
+    for string in strings:
+        if string.isdecimal():
+            append(int(string))
+        elif m := match(string):
+            numstr, suffix = m.groups()
+            try:
+                if numstr.isdecimal():
+                    append(int(numstr) * exp_sym[suffix])
+                else:
+                    append(int(float(numstr) * exp_sym[suffix]))
+            except (ValueError, OverflowError):
+                # raises with the same message as string_to_bytes
+                _match_bytes(string, m, exp_sym[suffix])
+        else:
+            append(string_to_bytes(string, standard))
+    return out
+
+
 class BytesUnit:
     """
     Numeric methods:
@@ -144,6 +204,8 @@ class BytesUnit:
           >>> 
         __r*__ methods called only for non BytesUnit objects.
     """
+    __slots__ = ('_value', '_symbol', '_standard', '_exp')
+
     def __init__ (self,
                   value:    int|float|str,
                   unit:     str|None = None,
@@ -162,7 +224,7 @@ class BytesUnit:
                 _bytes, _symbol, _got_suffix = string_to_bytes(value, self._standard, True)
                 if self._symbol is None:
                     self._symbol = _symbol
-                    self._value = _bytes / self._standard.EXP_SYM[self._symbol]
+                    self._value = _exact_div(_bytes, self._standard.EXP_SYM[self._symbol])
                 elif _got_suffix:
                     raise TypeError(f"Double unit indication: '{unit}' and '{value}'")
                 else:
@@ -190,16 +252,31 @@ class BytesUnit:
                 raise ValueError(f'<{value}> is too big!') from None
         if self._symbol is None:
             self._symbol =self._standard.SYMBOL
+        self._exp = self._standard.EXP_SYM[self._symbol] if self._standard.FIXED_EXP else None
+
+    @classmethod
+    def _new (cls, value, symbol, standard, exp):
+        """
+        Fast constructor for already validated values, used by the numeric methods.
+        *exp* must be standard.EXP_SYM[symbol] (or None if not standard.FIXED_EXP).
+        """
+        obj = cls.__new__(cls)
+        obj._value = value
+        obj._symbol = symbol
+        obj._standard = standard
+        obj._exp = exp
+        return obj
 
     @property
     def bytes (self):
-        return self._value * self.exp
+        return self._value * (self._exp or self.exp)
     @property
     def value (self):
         return self._value
     @property
     def exp (self):
-        return self.standard.EXP_SYM[self.symbol]
+        # NOTE: _exp is not cached (None) for standards without FIXED_EXP
+        return self._exp or self._standard.EXP_SYM[self._symbol]
     @property
     def symbol (self):
         return self._symbol
@@ -217,8 +294,10 @@ class BytesUnit:
         if sym not in self.standard.UNIT_SYMBOLS:
             raise ValueError(f'Unknown symbol "{sym}"')
         if sym != self._symbol:
-            self._value = self.bytes / self.standard.EXP_SYM[sym]
+            exp = self.standard.EXP_SYM[sym]
+            self._value = _exact_div(self.bytes, exp)
             self._symbol = sym
+            self._exp = exp if self.standard.FIXED_EXP else None
     @property
     def standard (self):
         return self._standard
@@ -238,166 +317,125 @@ class BytesUnit:
     ######################
     def __eq__ (self, other):
         """Compare equals with istances of BytesUnit with the same value and bytes class."""
-        try:
-            return self.standard == other.standard and self.bytes == other.bytes
-        except (AttributeError, TypeError):
-            return False
+        if not isinstance(other, BytesUnit):
+            return NotImplemented
+        return self.standard == other.standard and self.bytes == other.bytes
     def __ne__ (self, other):
         return not (self == other)
     def __lt__ (self, other):
-        try:
-            return self.standard == other.standard and self.bytes < other.bytes
-        except (AttributeError, TypeError):
-            raise TypeError(f"'<' not supported between instances of"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, BytesUnit):
+            return NotImplemented
+        return self.standard == other.standard and self.bytes < other.bytes
     def __le__ (self, other):
-        try:
-            return self.standard == other.standard and self.bytes <= other.bytes
-        except (AttributeError, TypeError):
-            raise TypeError(f"'<=' not supported between instances of"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, BytesUnit):
+            return NotImplemented
+        return self.standard == other.standard and self.bytes <= other.bytes
     def __gt__ (self, other):
-        try:
-            return self.standard == other.standard and self.bytes > other.bytes
-        except (AttributeError, TypeError):
-            raise TypeError(f"'>' not supported between instances of"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, BytesUnit):
+            return NotImplemented
+        return self.standard == other.standard and self.bytes > other.bytes
     def __ge__ (self, other):
-        try:
-            return self.standard == other.standard and self.bytes >= other.bytes
-        except (AttributeError, TypeError):
-            raise TypeError(f"'>=' not supported between instances of"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None  
+        if not isinstance(other, BytesUnit):
+            return NotImplemented
+        return self.standard == other.standard and self.bytes >= other.bytes
 
     ###################
     # numeric methods #
     ###################
+    def _as_value (self, other):
+        """
+        Returns *other* as a value in the unit of self: ints and floats
+        as they are, BytesUnit objects converted. NotImplemented otherwise.
+        """
+        if isinstance(other, (int, float)):
+            return other
+        elif isinstance(other, BytesUnit):
+            return _exact_div(other.bytes, self._exp or self.exp)
+        return NotImplemented
     def __add__ (self, other):
-        try:
-            if isinstance(other, (int, float)):
-                return BytesUnit(self.value + other, self.symbol, self.standard)
-            else:
-                return BytesUnit(self.value + (other.bytes / self.exp), self.symbol, self.standard)
-        except (AttributeError, TypeError) as e:
-            raise TypeError(f"not supported operand type(s) for +:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}': {e}") from None  
+        value = self._as_value(other)
+        if value is NotImplemented:
+            return NotImplemented
+        return BytesUnit._new(self._value + value, self._symbol, self._standard, self._exp)
     def __radd__ (self, other):
-        try:
-            return BytesUnit(other + self.value, self.symbol, self.standard)
-        except (AttributeError, TypeError) as e:
-            raise TypeError(f"__radd__: not supported operand type(s) for +:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}': {e}") from None
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return BytesUnit._new(other + self._value, self._symbol, self._standard, self._exp)
     def __truediv__ (self, other):
-        try:
-            if isinstance(other, (int, float)):
-                return BytesUnit(self.value / other, self.symbol, self.standard)
-            else:
-                return BytesUnit(self.value / (other.bytes / self.exp), self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for /:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        value = self._as_value(other)
+        if value is NotImplemented:
+            return NotImplemented
+        return BytesUnit._new(self._value / value, self._symbol, self._standard, self._exp)
     def __rtruediv__ (self, other):
-        try:
-            return BytesUnit(other / self.value, self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for /:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return BytesUnit._new(other / self._value, self._symbol, self._standard, self._exp)
     def __floordiv__ (self, other):
-        try:
-            if isinstance(other, (int, float)):
-                return BytesUnit(self.value // other, self.symbol, self.standard)
-            else:
-                return BytesUnit(self.value // (other.bytes / self.exp), self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for /:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        value = self._as_value(other)
+        if value is NotImplemented:
+            return NotImplemented
+        return BytesUnit._new(self._value // value, self._symbol, self._standard, self._exp)
     def __rfloordiv__ (self, other):
-        try:
-            return BytesUnit(other // self.value, self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for /:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return BytesUnit._new(other // self._value, self._symbol, self._standard, self._exp)
     def __mod__ (self, other):
-        try:
-            if isinstance(other, (int, float)):
-                return BytesUnit(self.value % other, self.symbol, self.standard)
-            else:
-                return BytesUnit(self.value % (other.bytes / self.exp), self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for %:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        value = self._as_value(other)
+        if value is NotImplemented:
+            return NotImplemented
+        return BytesUnit._new(self._value % value, self._symbol, self._standard, self._exp)
     def __rmod__ (self, other):
-        try:
-            return BytesUnit(other % self.value, self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for %:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return BytesUnit._new(other % self._value, self._symbol, self._standard, self._exp)
     def __mul__ (self, other):
-        try:
-            if isinstance(other, (int, float)):
-                return BytesUnit(self.value * other, self.symbol, self.standard)
-            else:
-                return BytesUnit(self.value * (other.bytes / self.exp), self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for *:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        value = self._as_value(other)
+        if value is NotImplemented:
+            return NotImplemented
+        return BytesUnit._new(self._value * value, self._symbol, self._standard, self._exp)
     def __rmul__ (self, other):
-        try:
-            return BytesUnit(other * self.value, self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for *:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return BytesUnit._new(other * self._value, self._symbol, self._standard, self._exp)
     def __pow__ (self, other):
-        try:
-            if isinstance(other, (int, float)):
-                return BytesUnit(self.value ** other, self.symbol, self.standard)
-            else:
-                return BytesUnit(self.value ** (other.bytes / self.exp), self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for **:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        value = self._as_value(other)
+        if value is NotImplemented:
+            return NotImplemented
+        return BytesUnit._new(self._value ** value, self._symbol, self._standard, self._exp)
     def __sub__ (self, other):
         """
         NOTE: negative values doesn't make soo much sense in this context,
         nevertheless can be useful in some situations, so negative byte values are allowed.
         """
-        try:
-            if isinstance(other, (int, float)):
-                return BytesUnit(self.value - other, self.symbol, self.standard)
-            else:
-                return BytesUnit(self.value - (other.bytes / self.exp), self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for -:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        value = self._as_value(other)
+        if value is NotImplemented:
+            return NotImplemented
+        return BytesUnit._new(self._value - value, self._symbol, self._standard, self._exp)
     def __rsub__ (self, other):
-        try:
-            return BytesUnit(other - self.value, self.symbol, self.standard)
-        except (AttributeError, TypeError):
-            raise TypeError(f"not supported operand type(s) for -:"
-                            f"'{self.__class__.__name__}' and '{other.__class__.__name__}'") from None
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return BytesUnit._new(other - self._value, self._symbol, self._standard, self._exp)
     #########################
     # Numeric unary methods #
     #########################
     def __neg__ (self):
-        print("NEG")
-        return BytesUnit(- self.value, self.symbol, self.standard)
+        return BytesUnit._new(- self._value, self._symbol, self._standard, self._exp)
     def __pos__ (self):
-        print("POS")
-        return BytesUnit(+ self.value, self.symbol, self.standard)
+        return BytesUnit._new(+ self._value, self._symbol, self._standard, self._exp)
     def __abs__ (self):
-        return BytesUnit(abs(self.value), self.symbol, self.standard)
+        return BytesUnit._new(abs(self._value), self._symbol, self._standard, self._exp)
 
     ##########################
     # Other numberic methods #
     ##########################
     def __round__ (self, digs=None):
-        return BytesUnit(round(self.value, digs), self.symbol, self.standard)
+        return BytesUnit._new(round(self._value, digs), self._symbol, self._standard, self._exp)
     def __trunc__ (self):
-        return BytesUnit(trunc(self.value), self.symbol, self.standard)
+        return BytesUnit._new(trunc(self._value), self._symbol, self._standard, self._exp)
     def __floor__ (self):
-        return BytesUnit(math.floor(self.value), self.symbol, self.standard)
+        return BytesUnit._new(floor(self._value), self._symbol, self._standard, self._exp)
     def __ceil__ (self):
-        return BytesUnit(math.ceil(self.value), self.symbol, self.standard)
+        return BytesUnit._new(ceil(self._value), self._symbol, self._standard, self._exp)
 
     def convert(self, standard, unit=None):
         """
@@ -18,7 +18,11 @@
 # along with this program; if not see <http://www.gnu.org/licenses/>   
 
 from collections.abc import Iterable
-from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import errno
+from functools import partial
+from itertools import repeat
+from math import ceil
 import os
 import sys
 
@@ -36,47 +40,102 @@ def dcount (depth, start=0, this=True):
     """Returns an iterator counting from *start* to *depth*,
     yielding *this* at each step. *depth* can be infinity."""
     if depth == float('+inf'):
-        def inner_count():
-            while True:
-                yield this
-    else:
-        def inner_count():
-            level = start
-            while level < depth:
-                level += 1
-                yield this
-    return inner_count
-
-def find (path, depth=float('+inf')):
+        return partial(repeat, this)
+    if not depth > start: # also for -inf and nan
+        return partial(repeat, this, 0)
+    return partial(repeat, this, ceil(depth - start))
+
+# os.scandir checks the effective ids, which (e.g. in setuid programs)
+# may differ from the real ones os.access uses by default.
+_ACCESS_KWARGS = {'effective_ids': True} if os.access in os.supports_effective_ids else {}
+
+def _unreadable (path):
+    """Returns True, emitting a warning, if the *path* directory can't
+    be read. Much cheaper than getting the PermissionError from os.scandir
+    on trees with many unreadable dirs.
+    Returns False if *path* is not a directory (anymore), so that the
+    actual error is reported by os.scandir."""
+    if os.access(path, os.R_OK, **_ACCESS_KWARGS) or not os.path.isdir(path):
+        return False
+    err = PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+    pywarn.warn(FilelistWarning('while scanning {} => {}'.format(path, err)))
+    return True
+
+
+def _scan (base, level, depth):
+    """Scans the *base* directory (at *level*) and returns a pair of
+    lists: the files found and the (subdir, level) pairs to be visited
+    to reach *depth*."""
+    files = []
+    subdirs = []
+    # NOTE: the starting path (level 0) is left to os.scandir, to get
+    # the right error if it doesn't exist. The PermissionError check is
+    # still needed, since permissions can change after os.access.
+    if level and _unreadable(base):
+        return files, subdirs
+    try:
+        with os.scandir(base) as dir_iter:
+            for item in dir_iter:
+                if item.is_file():
+                    files.append(item.path)
+                elif level < depth and item.is_dir(follow_symlinks=False):
+                    subdirs.append((item.path, level + 1))
+    except PermissionError as e:
+        pywarn.warn(FilelistWarning('while scanning {} => {}'.format(base, e)))
+    return files, subdirs
+
+
+def _find_threaded (path, depth, jobs):
+    """Like find(), scanning directories concurrently using
+    *jobs* threads. Pathnames are yielded in no particular order."""
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        pending = {executor.submit(_scan, path, 0, depth)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                for subdir, level in subdirs:
+                    pending.add(executor.submit(_scan, subdir, level, depth))
+                yield from files
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def find (path, depth=float('+inf'), jobs=1):
     """Yields pathnames starting from *path* descending *depth* levels.
     Level 0 is the level of *path*.
+    If *jobs* is greater than 1 directories are scanned in parallel
+    by that many threads (useful on high latency filesystems, like
+    network mounts), and the pathnames order is unpredictable;
+    for *jobs* < 1 use a default number of threads.
     Raise ValueError for invalid *depth* values.
     Use the py_warnings module to tune the behaviour in case of
     paths related errors."""
     if depth < 0:
         raise ValueError("find: invalid *depth* value, must be >= 0")
-    levels = [[path]]
-    for _ in dcount(depth)():
-        new_level = []
-        for base in levels[-1]:
-            try:
-                with os.scandir(base) as dir_iter:
-                    for item in dir_iter:
-                        if item.is_dir(follow_symlinks=False):
-                            new_level.append(item.path)
-            except PermissionError as e:
-                pywarn.warn(FilelistWarning('while scanning {} => {}'.format(base, e)))
-        if not new_level:
-            break
-        levels.append(new_level)
-    for dirname in chain(*levels):
+    if jobs < 1:
+        jobs = min(32, (os.cpu_count() or 1) * 4)
+    if jobs > 1:
+        yield from _find_threaded(path, depth, jobs)
+        return
+    stack = [(path, 0)]
+    while stack:
+        base, level = stack.pop()
+        if level and _unreadable(base):
+            continue
+        subdirs = []
         try:
-            with os.scandir(dirname) as dir_iter:
+            with os.scandir(base) as dir_iter:
                 for item in dir_iter:
                     if item.is_file():
                         yield item.path
+                    elif level < depth and item.is_dir(follow_symlinks=False):
+                        subdirs.append((item.path, level + 1))
         except PermissionError as e:
-                pywarn.warn(FilelistWarning('while scanning {} => {}'.format(dirname, e)))
+            pywarn.warn(FilelistWarning('while scanning {} => {}'.format(base, e)))
+        # reversed, to visit the subdirs in scandir order
+        stack.extend(reversed(subdirs))
 
 
 if __name__ == '__main__':
@@ -87,6 +146,12 @@ if __name__ == '__main__':
                         help='''Descend %(metavar)s levels of subdirs.
                         For values < 0 descend as deep as possible (the default).
                         Level 0 is the level of the given path.''')
+    parser.add_argument('-j', '--jobs',
+                        dest='jobs', type=int, default=1, metavar='N',
+                        help='''Scan directories using %(metavar)s threads
+                        (default: %(default)s, no threads). For values < 1
+                        use a number of threads based on the available CPUs.
+                        With more than one thread the output order is unpredictable.''')
     errwarn = parser.add_mutually_exclusive_group()
     errwarn.add_argument('-w', '--warn',
                         dest='warn', action='store_true',
@@ -107,7 +172,7 @@ if __name__ == '__main__':
         pywarn.set_filter(pywarn.ERROR_FROM_WARNINGS, FilelistWarning)
     try:
         for path in args.paths:
-            for p in find(path, args.depth):
+            for p in find(path, args.depth, args.jobs):
                 print(p)
     except Exception as e:
         print(f'ERROR: {e}', file=sys.stderr)
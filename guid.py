@@ -17,31 +17,73 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not see <http://www.gnu.org/licenses/>
 
+from functools import lru_cache
 import grp
 import pwd
 
+# cached lookups: the users and groups databases are usually
+# queried many times for the same few ids (e.g. while listing files).
+# Use clear_cache() if the databases may have changed.
+@lru_cache(maxsize=512)
+def _pw_by_uid (uid):
+    return pwd.getpwuid(uid)
+@lru_cache(maxsize=512)
+def _pw_by_name (username):
+    return pwd.getpwnam(username)
+@lru_cache(maxsize=512)
+def _gr_by_gid (gid):
+    return grp.getgrgid(gid)
+@lru_cache(maxsize=512)
+def _gr_by_name (groupname):
+    return grp.getgrnam(groupname)
+
+# username => [groupnames] index, built on first use
+_user_to_groups: dict[str, list[str]] | None = None
+
+def _build_group_index ():
+    """Build the username => groups index, scanning the groups database once."""
+    index = {}
+    for g in grp.getgrall():
+        for u in set(g.gr_mem):
+            index.setdefault(u, []).append(g.gr_name)
+    return index
+
+def invalidate_group_index ():
+    """Drop the username => groups index, rebuilt at the next request."""
+    global _user_to_groups
+    _user_to_groups = None
+
+def clear_cache ():
+    """Clear the cached users and groups lookups."""
+    for func in (_pw_by_uid, _pw_by_name, _gr_by_gid, _gr_by_name):
+        func.cache_clear()
+    invalidate_group_index()
+
 def _groups_of (username):
     """Return the groups to which *username* belongs."""
-    return list(x.gr_name for x in grp.getgrall() if username in x.gr_mem)
+    global _user_to_groups
+    if _user_to_groups is None:
+        _user_to_groups = _build_group_index()
+    return list(_user_to_groups.get(username, []))
 
 def _users_of (groupname):
     """Return usernames which belongs to *groupname*."""
-    return grp.getgrnam(groupname).gr_mem
+    return list(_gr_by_name(groupname).gr_mem) # a copy, not the cached one
     
 def _attr_from_username (username, attr):
     """Return the attribute *attr* of the given *username*"""
-    return getattr(pwd.getpwnam(username), attr)
+    return getattr(_pw_by_name(username), attr)
 
 def _attr_from_groupname (groupname, attr):
     """Return the attribute *attr* of the given *groupname*"""
-    return getattr(grp.getgrnam(groupname), attr)
+    return getattr(_gr_by_name(groupname), attr)
 
 def attr_from_uid (uid, attr):
     """Return the attribute *attr* of the given *uid*"""
-    return getattr(pwd.getpwuid(uid), attr)
+    return getattr(_pw_by_uid(uid), attr)
 def attr_from_gid (gid, attr):
     """Return the attribute *attr* of the given *gid*"""
-    return getattr(grp.getgrgid(gid), attr)
+    return getattr(_gr_by_gid(gid), attr)
 
 def name_from_uid (uid):
     return attr_from_uid(uid, 'pw_name')
@@ -95,21 +137,19 @@ if __name__ == '__main__':
                         help='get the usernames which belongs to %(metavar)s.')
 
     args = parser.parse_args()
-    for e in args.uids:
-        try:print(e, name_from_uid(e))
-        except KeyError as err: print(e, 'FAIL: {}'.format(err), file=sys.stderr)
-    for e in args.gids:
-        try:print(e, name_from_gid(e))
-        except KeyError as err: print(e, 'FAIL: {}'.format(err), file=sys.stderr)
-    for e in args.usernames:
-        try:print(e, uid_from_name(e))
-        except KeyError as err: print(e, 'FAIL: {}'.format(err), file=sys.stderr)
-    for e in args.groupnames:
-        try:print(e, gid_from_name(e))
-        except KeyError as err: print(e, 'FAIL: {}'.format(err), file=sys.stderr)
-    for e in args.group_of:
-        try:print(e, groups_of_name(e))
-        except KeyError as err: print(e, 'FAIL: {}'.format(err), file=sys.stderr)
-    for e in args.users_of:
-        try:print(e, users_of_name(e))
-        except KeyError as err: print(e, 'FAIL: {}'.format(err), file=sys.stderr)
+    # dedup the arguments and write the results at once
+    out_lines = []
+    err_lines = []
+    for values, func in ((args.uids, name_from_uid),
+                         (args.gids, name_from_gid),
+                         (args.usernames, uid_from_name),
+                         (args.groupnames, gid_from_name),
+                         (args.group_of, groups_of_name),
+                         (args.users_of, users_of_name)):
+        for e in dict.fromkeys(values):
+            try: out_lines.append(f'{e} {func(e)}')
+            except KeyError as err: err_lines.append(f'{e} FAIL: {err}')
+    if out_lines:
+        sys.stdout.write('\n'.join(out_lines) + '\n')
+    if err_lines:
+        sys.stderr.write('\n'.join(err_lines) + '\n')
@@ -19,12 +19,13 @@
 
 from collections import defaultdict
 from collections.abc import Callable, Sequence, Iterator
-from functools import partial
-import hashlib
-from fnmatch import fnmatch
+from functools import lru_cache, partial
+from fnmatch import fnmatch, translate
 from numbers import Number
+from operator import attrgetter
 import os
 import re
+from stat import S_ISLNK
 import sys
 
 # external modules
@@ -35,16 +36,81 @@ class PathWarning(pywarn.CustomWarning):
     pass
 # set warnings to nothing, to be customize in the modules where it's imported
 pywarn.set_filter(pywarn.IGNORE_WARNINGS, PathWarning)
+# False only when set_warnings() ignored PathWarning, skips building the
+# warnings at all. True by default, since the filter can also be changed
+# with pywarn.set_filter directly.
+_WARN_ENABLED = True
+
+def set_warnings (action) -> None:
+    """
+    Sets the pywarn $action filter for PathWarning, like
+    pywarn.set_filter($action, PathWarning). With pywarn.IGNORE_WARNINGS
+    the warnings are not even created, which is faster when many paths fail.
+    """
+    global _WARN_ENABLED
+    pywarn.set_filter(action, PathWarning)
+    _WARN_ENABLED = (action != pywarn.IGNORE_WARNINGS)
 
 
 #
 # Manage the 'strict' parameter of os.path.realpath (added since python 3.10)
 #
 vinfo = sys.version_info
-if vinfo.major == 3 and vinfo.minor < 10:
+_STRICT_REALPATH = not (vinfo.major == 3 and vinfo.minor < 10)
+if not _STRICT_REALPATH:
     realpath = os.path.realpath
 else:
-    realpath = partial(os.path.realpath, strict=True)
+    # a plain function is cheaper to call than a functools.partial
+    def realpath (path, _realpath=os.path.realpath):
+        return _realpath(path, strict=True)
+
+# realpath results of the parent directories of the absolute paths given
+# to get_real(..., cached=True), many paths usually share the same
+# directories. The last path component is checked at every call, but a
+# cached parent directory can be stale if it has been replaced (e.g. by a
+# symlink): use clear_cache() if the filesystem may have changed.
+@lru_cache(maxsize=8192)
+def _realdir_cached (dirpath: str) -> str:
+    return realpath(dirpath)
+
+def _realpath_cached (path: str) -> str:
+    """
+    Returns realpath($path) for an absolute $path, resolving its parent
+    directory through a cache and strictly checking the last component.
+    """
+    head, tail = os.path.split(path)
+    if tail in ('', '.', '..'):
+        return realpath(path)
+    real_path = os.path.join(_realdir_cached(head), tail)
+    if S_ISLNK(os.lstat(real_path).st_mode):
+        return realpath(real_path)
+    return real_path
+
+def clear_cache () -> None:
+    """Clear the cached realpath results."""
+    _realdir_cached.cache_clear()
+
+
+# NOTE: hashlib, mmap and concurrent.futures are imported by the functions
+# using them, since they're slow to import and not needed by most callers.
+
+# files bigger than this are hashed by get_hash using mmap
+# (if hashlib.file_digest is not available, python < 3.11).
+MMAP_HASH_THRESHOLD = 64 * 2**20
+
+# fnmatch special characters, for compile_filters
+_GLOB_SPECIALS = frozenset('*?[')
+
+# flags which merge_regex can apply to a single pattern
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+
+def bind_regex (cregex: Sequence[re.Pattern], match_method: str = 'search') -> list[Callable]:
+    """
+    Returns the re.Pattern.$match_method bound methods of $cregex,
+    to be used with check_regex_bound and exclude_regex_bound.
+    """
+    return [getattr(r, match_method) for r in cregex]
 
 
 def check_pattern (path: str,
@@ -52,7 +118,23 @@ def check_pattern (path: str,
     """
     Checks if $path matches any elements of $patterns (use fnmatch).
     """
-    return any(fnmatch(path, p) for p in patterns)
+    for p in patterns:
+        if fnmatch(path, p):
+            return True
+    return False
+
+
+def check_pattern_compiled (path: str,
+                            cpatterns: Sequence[re.Pattern]) -> bool:
+    """
+    Like check_pattern, with $cpatterns made by compile_patterns.
+    Faster when matching many paths against the same patterns.
+    """
+    path = os.path.normcase(path)
+    for p in cpatterns:
+        if p.match(path):
+            return True
+    return False
 
 
 def check_regex (path: str, cregex: Sequence[re.Pattern], match_method: str = 'search') -> bool:
@@ -60,7 +142,21 @@ def check_regex (path: str, cregex: Sequence[re.Pattern], match_method: str = 's
     Checks if $path matches any elements of $cregex,
     using re.Patter.$match_method for testing $path (default to 'search').
     """
-    return any(getattr(r, match_method)(path) for r in cregex)
+    for r in cregex:
+        if getattr(r, match_method)(path):
+            return True
+    return False
+
+
+def check_regex_bound (path: str, methods: Sequence[Callable]) -> bool:
+    """
+    Like check_regex, with $methods made by bind_regex. Faster when
+    matching many paths, since the match methods are looked up only once.
+    """
+    for m in methods:
+        if m(path):
+            return True
+    return False
 
 
 def check_regular (path: str) -> bool:
@@ -68,18 +164,55 @@ def check_regular (path: str) -> bool:
     Returns True if $path is a regular file and not a broken symlink nor
     a file for wich the user doesn't have enough permissions.
     """
-    return os.path.exists(path) and os.path.isfile(path)
+    return os.path.isfile(path)
 
 
 def check_stat_attr (path: str,
                         op: Callable,
                         stat_attr: str,
-                        value: Number) -> bool:
+                        value: Number,
+                        st: os.stat_result|None = None) -> bool:
     """
     Checks if $path has the $stat_attr attribute set
     to $value using $op as comparison function.
+    $st, if given, is used instead of calling os.stat($path)
+    (to check many attributes of the same path).
+    """
+    if st is None:
+        st = os.stat(path)
+    return op(getattr(st, stat_attr), value)
+
+
+def compile_filters (patterns: Sequence[str]) -> tuple[frozenset, tuple, tuple, list]:
+    """
+    Splits the fnmatch-style $patterns to be used with match_filters:
+    returns a tuple of (literals, prefixes, suffixes, regexes), so only the
+    patterns which really need it are matched with a regex, e.g. "foo"
+    is checked as path == "foo", "foo*" with path.startswith("foo")
+    and "*foo" with path.endswith("foo").
+    """
+    literals = set()
+    prefixes = []
+    suffixes = []
+    regexes = []
+    for p in map(os.path.normcase, patterns):
+        if not _GLOB_SPECIALS.intersection(p):
+            literals.add(p)
+        elif p.endswith('*') and not _GLOB_SPECIALS.intersection(p[:-1]):
+            prefixes.append(p[:-1])
+        elif p.startswith('*') and not _GLOB_SPECIALS.intersection(p[1:]):
+            suffixes.append(p[1:])
+        else:
+            regexes.append(re.compile(translate(p)))
+    return frozenset(literals), tuple(prefixes), tuple(suffixes), regexes
+
+
+def compile_patterns (patterns: Sequence[str]) -> list[re.Pattern]:
+    """
+    Returns the fnmatch-style $patterns as compiled regex objects,
+    to be used with check_pattern_compiled and exclude_pattern_compiled.
     """
-    return op(getattr(os.stat(path), stat_attr), value)
+    return [re.compile(translate(os.path.normcase(p))) for p in patterns]
 
 
 def exclude_pattern (path: str, patterns: Sequence[str]) -> bool:
@@ -89,6 +222,13 @@ def exclude_pattern (path: str, patterns: Sequence[str]) -> bool:
     return not check_pattern(path, patterns)
 
 
+def exclude_pattern_compiled (path: str, cpatterns: Sequence[re.Pattern]) -> bool:
+    """
+    Like exclude_pattern, with $cpatterns made by compile_patterns.
+    """
+    return not check_pattern_compiled(path, cpatterns)
+
+
 def exclude_regex (path: str, cregex: Sequence[re.Pattern], match_method: str = 'search') -> bool:
     """
     Returns True if $path *not* match any of the $regex pattern,
@@ -97,64 +237,239 @@ def exclude_regex (path: str, cregex: Sequence[re.Pattern], match_method: str =
     return not check_regex(path, cregex, match_method)
 
 
+def exclude_regex_bound (path: str, methods: Sequence[Callable]) -> bool:
+    """
+    Like exclude_regex, with $methods made by bind_regex.
+    """
+    return not check_regex_bound(path, methods)
+
+
 def expand_path (path: str) -> str:
     """Expands $path to the canonical form."""
     return os.path.abspath(os.path.expanduser(os.path.expandvars(path)))
 
 
-def get_hash (path: str, hash_type_name: str, size: int) -> str:
+def filter_stat_attr (paths: Sequence[str],
+                      op: Callable,
+                      stat_attr: str,
+                      value: Number,
+                      max_workers: int|None = None) -> list[str]:
+    """
+    Returns the $paths for which check_stat_attr($path, $op, $stat_attr, $value)
+    is true. The paths are stat'ed in parallel using up to $max_workers
+    threads (see ThreadPoolExecutor for the default, 1 means no threads),
+    since os.stat releases the GIL.
+    Raises the first exception raised by os.stat, if any.
+    """
+    if max_workers == 1:
+        stats = map(os.stat, paths)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            stats = list(executor.map(os.stat, paths))
+    return [path for path, st in zip(paths, stats)
+            if op(getattr(st, stat_attr), value)]
+
+
+def get_hash (path: str, hash_type_name: str, size: int = 2**20) -> str:
     """
     Returns the hash of $path using hashlib.new($hash_type_name).
-    Reads blocks of $size bytes of the file at a time.
+    Uses hashlib.file_digest if available (python >= 3.11), otherwise
+    memory-maps files bigger than MMAP_HASH_THRESHOLD bytes or reads
+    blocks of $size bytes of the file at a time.
     """
+    import hashlib
     with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, hash_type_name).hexdigest()
         hashed = hashlib.new(hash_type_name)
-        while True:
-            buf = f.read(size)
-            if not buf:
-                break
-            hashed.update(buf)
+        if os.fstat(f.fileno()).st_size > MMAP_HASH_THRESHOLD:
+            import mmap
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hashed.update(mm)
+        else:
+            while True:
+                buf = f.read(size)
+                if not buf:
+                    break
+                hashed.update(buf)
     return hashed.hexdigest()
 
 
-def get_real (path: str) -> tuple[bool, str|None, None|Exception]:
+def get_hashes (paths: Sequence[str],
+                hash_type_name: str,
+                size: int = 2**20,
+                max_workers: int|None = None) -> dict[str, str]:
+    """
+    Returns a dict of {path: hash} for each of $paths, hashed by get_hash
+    in parallel using up to $max_workers threads (see ThreadPoolExecutor
+    for the default). hashlib releases the GIL while hashing data bigger
+    than 2047 bytes, so the threads really run in parallel.
+    Raises the first exception raised by get_hash, if any.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    hash_func = partial(get_hash, hash_type_name=hash_type_name, size=size)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(paths, executor.map(hash_func, paths)))
+
+
+def get_real (path: str, cached: bool = False) -> tuple[bool, str|None, None|Exception]:
     """
     Return the canonical path of *path*, checking if realpath($path) == $path
     Returns (bool, realpath, None) or, if something's wrong, (False, None, raised exception).
     See: https://docs.python.org/3.8/library/os.path.html#os.path.realpath
+    If $cached is true, the real paths of the parent directories of absolute
+    paths are cached, which is faster for many paths in the same directories
+    but results may be stale if those directories are replaced (see
+    clear_cache). Removed paths are always detected.
     """
     try:
-        real_path = realpath(path)
+        # relative paths depends on the current directory, don't cache them.
+        # Without strict realpath (python < 3.10) missing paths are fine, no cache.
+        if cached and _STRICT_REALPATH and os.path.isabs(path):
+            real_path = _realpath_cached(path)
+        else:
+            real_path = realpath(path)
         is_real = (real_path == path)
         return is_real, real_path, None
     except OSError as err:
-        pywarn.warn(PathWarning(f'{path} => {err}'))
+        if _WARN_ENABLED:
+            pywarn.warn(PathWarning(f'{path} => {err}'))
         return False, None, err
 
 
-def prune_regular (path: str) -> tuple[bool, str]:
+def make_filter (patterns: Sequence[str] = (),
+                 cregex: Sequence[re.Pattern] = (),
+                 match_method: str = 'search',
+                 stat_checks: Sequence[tuple[Callable, str, Number]] = ()) -> Callable[[str], bool]:
+    """
+    Returns a function f(path) -> bool which is True if path matches any of
+    the fnmatch-style $patterns (like check_pattern), any of the $cregex
+    (like check_regex with $match_method), or any of the $stat_checks
+    (op, stat_attr, value) tuples (like check_stat_attr, os.stat is called
+    at most once). The function's code is generated with only the needed
+    checks, in that order, to be fast when applied to many paths.
+    """
+    literals, prefixes, suffixes, regexes = compile_filters(patterns)
+    ns = {'_normcase': os.path.normcase, '_stat': os.stat,
+          '_literals': literals, '_prefixes': prefixes, '_suffixes': suffixes}
+    src = ['def _filter(path):']
+    if patterns:
+        src.append('    npath = _normcase(path)')
+    if literals:
+        src.append('    if npath in _literals: return True')
+    if prefixes:
+        src.append('    if npath.startswith(_prefixes): return True')
+    if suffixes:
+        src.append('    if npath.endswith(_suffixes): return True')
+    for i, r in enumerate(regexes):
+        ns[f'_p{i}'] = r.match
+        src.append(f'    if _p{i}(npath): return True')
+    for i, method in enumerate(bind_regex(cregex, match_method)):
+        ns[f'_r{i}'] = method
+        src.append(f'    if _r{i}(path): return True')
+    if stat_checks:
+        src.append('    st = _stat(path)')
+    for i, (op, stat_attr, value) in enumerate(stat_checks):
+        ns[f'_op{i}'] = op
+        ns[f'_a{i}'] = attrgetter(stat_attr)
+        ns[f'_v{i}'] = value
+        src.append(f'    if _op{i}(_a{i}(st), _v{i}): return True')
+    src.append('    return False')
+    exec('\n'.join(src), ns)
+    return ns['_filter']
+
+
+def match_filters (path: str, filters: tuple) -> bool:
     """
-    Return the real path of $path if it's a regular file, or False.
+    Checks if $path matches any of the patterns in $filters, made by
+    compile_filters. Same result of check_pattern with the original patterns.
     """
-    is_real, real_path, err = get_real(path)
-    if real_path:
-        return check_regular(real_path) and real_path
+    literals, prefixes, suffixes, regexes = filters
+    path = os.path.normcase(path)
+    if path in literals or path.startswith(prefixes) or path.endswith(suffixes):
+        return True
+    for r in regexes:
+        if r.match(path):
+            return True
     return False
+
+
+def merge_regex (cregex: Sequence[re.Pattern]) -> re.Pattern:
+    """
+    Merges the $cregex str patterns in a single compiled regex (an
+    alternation of them), so check_regex($path, [merge_regex($cregex)])
+    scans $path once instead of once for each pattern, with the same result.
+    The patterns must share the same ASCII/LOCALE/UNICODE flags and must
+    not use numbered backreferences (groups are renumbered).
+    Raises ValueError if the patterns can't be merged.
+    """
+    if not cregex:
+        return re.compile('(?!)') # never matches, like check_regex with no patterns
+    global_flags = set()
+    parts = []
+    for r in cregex:
+        if not isinstance(r.pattern, str):
+            raise ValueError(f'merge_regex: not a str pattern: {r.pattern!r}')
+        global_flags.add(r.flags & (re.ASCII | re.LOCALE | re.UNICODE))
+        flags = ''.join(f for flag, f in _SCOPED_FLAGS if r.flags & flag)
+        # NOTE: newline to end a trailing comment of verbose patterns
+        end = '\n)' if r.flags & re.VERBOSE else ')'
+        parts.append(f'(?{flags}:{r.pattern}{end}')
+    if len(global_flags) > 1:
+        raise ValueError('merge_regex: patterns with different ASCII/LOCALE/UNICODE flags')
+    try:
+        return re.compile('|'.join(parts), global_flags.pop())
+    except re.error as e:
+        raise ValueError(f'merge_regex: {e}') from None
+
+
+def prune_regular (path: str, cached: bool = False) -> str|None:
+    """
+    Return the real path of $path if it's a regular file, or None.
+    $cached is passed to get_real.
+    """
+    _, real_path, _ = get_real(path, cached)
+    return real_path if (real_path and check_regular(real_path)) else None
 """
 def prune_regular_m (path: str) -> str:
     '''
     Return the real path of $path if $path is a regular file,
     otherwise returns the empty string.
    '''
-    ok, real_path = prune_regular(path)
-    return real_path if ok else ""
+    return prune_regular(path) or ""
 """
 
-def prune_regular_s (paths: Sequence[str]) -> Iterator[str]:
-    """Yields only regular $paths"""
-    for path in paths:
-        if real_path := prune_regular(path):
-            yield real_path
+def prune_regular_s (paths: Sequence[str|os.DirEntry]) -> Iterator[str]:
+    """
+    Yields only regular $paths (as real paths).
+    $paths items can also be os.DirEntry objects (e.g. from os.scandir),
+    for which the cached entry's informations are used, saving a stat call.
+    The real paths of the parent directories are cached while iterating
+    (see get_real), the cache is cleared at the end.
+    """
+    try:
+        for path in paths:
+            if isinstance(path, os.DirEntry):
+                if path.is_file():
+                    _, real_path, _ = get_real(path.path, True)
+                    if real_path:
+                        yield real_path
+            elif real_path := prune_regular(path, True):
+                yield real_path
+    finally:
+        clear_cache()
+
+
+def scan_regular (directory: str) -> Iterator[str]:
+    """
+    Yields the pathnames of the regular files (or symlinks to them)
+    in $directory, using the os.scandir's cached entries informations.
+    """
+    with os.scandir(directory) as dir_iter:
+        for entry in dir_iter:
+            if entry.is_file():
+                yield entry.path
 
 
 